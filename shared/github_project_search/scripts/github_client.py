@@ -0,0 +1,366 @@
+"""
+GitHub API Client
+带自适应超时、对冲请求、熔断和缓存降级的 GitHub 请求层
+"""
+import copy
+import hashlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, Any, Optional, Tuple
+
+import requests
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """熔断器打开且没有可用缓存时抛出"""
+
+
+class LatencyTracker:
+    """按端点记录最近的请求耗时，用于计算 p95 和自适应超时"""
+
+    def __init__(self, window: int = 50, min_samples: int = 5):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.setdefault(endpoint, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def percentile(self, endpoint: str, pct: float) -> Optional[float]:
+        """返回指定分位数，样本不足时返回 None"""
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < self.min_samples:
+            return None
+        index = min(int(len(samples) * pct), len(samples) - 1)
+        return samples[index]
+
+
+class CircuitBreaker:
+    """
+    简单的三态熔断器 (closed / open / half_open)
+
+    连续失败达到阈值后打开，冷却期内直接快速失败；
+    冷却期结束后放行一个探测请求，成功则关闭，失败则重新打开。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = 0.0
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def can_request(self) -> bool:
+        """与 allow_request 判断相同，但不占用半开状态的探测名额"""
+        with self._lock:
+            return self._state == self.CLOSED or time.monotonic() - self._opened_at >= self.reset_timeout
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout:
+                # 放行一个探测请求，其余请求继续快速失败
+                self._state = self.HALF_OPEN
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+    def release(self) -> None:
+        """归还未实际发出的探测名额，下一个请求可以立即探测"""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic() - self.reset_timeout
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class ResponseCache:
+    """
+    最近一次成功响应的降级缓存
+
+    只在熔断或请求失败时读取；GitHub 正常时总是发出实时请求，不会返回旧数据。
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, requests.Response]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[requests.Response]:
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, response: requests.Response) -> None:
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.monotonic(), response)
+
+
+# 进程级共享状态：搜索器按请求创建，统计与熔断需要跨请求保留
+_latency = LatencyTracker()
+_breaker = CircuitBreaker()
+_cache = ResponseCache()
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="github-hedge")
+
+# 限流按 token 独立熔断：一个 token 被限流不影响其它 token
+_rate_limit_breakers: Dict[str, CircuitBreaker] = {}
+_rate_limit_lock = threading.Lock()
+
+
+def _rate_limit_breaker(token_key: str) -> CircuitBreaker:
+    with _rate_limit_lock:
+        breaker = _rate_limit_breakers.get(token_key)
+        if breaker is None:
+            breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0)
+            _rate_limit_breakers[token_key] = breaker
+        return breaker
+
+
+class GitHubClient:
+    """
+    GitHub REST API 请求客户端
+
+    - 超时根据端点观测到的 p95 耗时自适应调整
+    - 请求超过 p95 仍未返回时发出一个对冲请求，取先返回者
+    - 连续失败（5xx / 网络错误）后全局熔断，限流则只熔断当前 token
+    - 熔断或请求失败时返回该请求最近一次成功的缓存响应，GitHub 正常时不读缓存
+    - 返回的 Response 带有 from_cache 属性，标识是否来自缓存
+    """
+
+    # 自适应超时 = p95 * 倍数，限制在 [MIN_TIMEOUT, 最大超时] 之间
+    TIMEOUT_MULTIPLIER = 3.0
+    MIN_TIMEOUT = 2.0
+    MAX_TIMEOUT = 15.0
+    HEDGE_PERCENTILE = 0.95
+
+    def __init__(
+        self,
+        token: str,
+        api_base: str = "https://api.github.com",
+        default_timeout: float = 10.0,
+        hedge: bool = True,
+        endpoint_timeouts: Optional[Dict[str, Tuple[float, float]]] = None
+    ):
+        """
+        Args:
+            token: GitHub token
+            api_base: API 地址
+            default_timeout: 没有足够延迟样本时的超时时间
+            hedge: 是否启用对冲请求
+            endpoint_timeouts: 按端点覆盖 {端点: (默认超时, 最大超时)}
+        """
+        self.token = token
+        self.api_base = api_base
+        self.default_timeout = default_timeout
+        self.hedge = hedge
+        self.endpoint_timeouts = endpoint_timeouts or {}
+        self.headers = {
+            "Authorization": f"token {token}",
+            "Accept": "application/vnd.github.v3+json"
+        }
+        self._token_key = hashlib.sha1(token.encode("utf-8")).hexdigest()[:12]
+        # 实际发出的 HTTP 请求数（含对冲请求，不含缓存命中），用于预热预算计费
+        self.requests_sent = 0
+        self._count_lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """全局熔断器与当前 token 的限流熔断器均未打开"""
+        return (
+            _breaker.state != CircuitBreaker.OPEN
+            and _rate_limit_breaker(self._token_key).state != CircuitBreaker.OPEN
+        )
+
+    def timeout_for(self, endpoint: str) -> float:
+        """根据端点历史耗时计算本次请求的超时时间"""
+        default_timeout, max_timeout = self.endpoint_timeouts.get(
+            endpoint, (self.default_timeout, self.MAX_TIMEOUT)
+        )
+        p95 = _latency.percentile(endpoint, self.HEDGE_PERCENTILE)
+        if p95 is None:
+            return default_timeout
+        return max(min(self.MIN_TIMEOUT, max_timeout), min(p95 * self.TIMEOUT_MULTIPLIER, max_timeout))
+
+    def get(
+        self,
+        endpoint: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None
+    ) -> requests.Response:
+        """
+        发起 GET 请求
+
+        Args:
+            endpoint: 端点分类名（如 search、contents），用于延迟统计
+            path: API 路径（如 /search/repositories）
+            params: 查询参数
+
+        Raises:
+            requests.exceptions.RequestException: 请求失败且没有可用缓存
+        """
+        url = f"{self.api_base}{path}"
+        cache_key = self._cache_key(url, params)
+
+        rate_limit_breaker = _rate_limit_breaker(self._token_key)
+        if not self._claim(rate_limit_breaker):
+            stale = _cache.get(cache_key)
+            if stale is not None:
+                return self._mark(stale, from_cache=True)
+            raise CircuitOpenError(f"GitHub API 暂时不可用（熔断中）: {path}")
+
+        try:
+            response = self._hedged_get(endpoint, url, params)
+        except requests.exceptions.RequestException:
+            _breaker.record_failure()
+            rate_limit_breaker.release()
+            stale = _cache.get(cache_key)
+            if stale is not None:
+                return self._mark(stale, from_cache=True)
+            raise
+
+        # 收到响应即说明 GitHub 可达：全局熔断只由 5xx 判定，限流只影响当前 token
+        if response.status_code >= 500:
+            _breaker.record_failure()
+            rate_limit_breaker.release()
+        else:
+            _breaker.record_success()
+            if self._is_rate_limited(response):
+                rate_limit_breaker.record_failure()
+            else:
+                rate_limit_breaker.record_success()
+                if response.status_code == 200:
+                    _cache.set(cache_key, response)
+                return self._mark(response, from_cache=False)
+
+        stale = _cache.get(cache_key)
+        if stale is not None:
+            return self._mark(stale, from_cache=True)
+        return self._mark(response, from_cache=False)
+
+    @staticmethod
+    def _claim(rate_limit_breaker: CircuitBreaker) -> bool:
+        """
+        先无副作用地检查两个熔断器，都放行时再占用探测名额，
+        避免一个 token 被限流时白白消耗全局熔断器的半开探测
+        """
+        if not (_breaker.can_request() and rate_limit_breaker.can_request()):
+            return False
+        if not rate_limit_breaker.allow_request():
+            return False
+        if not _breaker.allow_request():
+            rate_limit_breaker.release()
+            return False
+        return True
+
+    def _hedged_get(
+        self,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict[str, Any]]
+    ) -> requests.Response:
+        """发起请求，超过 p95 仍未返回时追加一个对冲请求"""
+        timeout = self.timeout_for(endpoint)
+        hedge_delay = _latency.percentile(endpoint, self.HEDGE_PERCENTILE) if self.hedge else None
+        # 整体截止时间从首个请求发出时算起，对冲等待不额外延长总耗时
+        deadline = time.monotonic() + timeout
+
+        futures = [_executor.submit(self._timed_get, endpoint, url, params, timeout)]
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                futures.append(_executor.submit(self._timed_get, endpoint, url, params, timeout))
+
+        pending = set(futures)
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+        finally:
+            # 取消仍在排队的请求，避免 GitHub 故障时被放弃的请求占满线程池
+            for future in pending:
+                future.cancel()
+
+        if isinstance(error, requests.exceptions.RequestException):
+            raise error
+        if error is not None:
+            raise requests.exceptions.RequestException(str(error))
+        raise requests.exceptions.Timeout(f"请求超时 ({timeout:.1f}s): {url}")
+
+    def _timed_get(
+        self,
+        endpoint: str,
+        url: str,
+        params: Optional[Dict[str, Any]],
+        timeout: float
+    ) -> requests.Response:
+        with self._count_lock:
+            self.requests_sent += 1
+        start = time.monotonic()
+        try:
+            response = requests.get(url, headers=self.headers, params=params, timeout=timeout)
+        except requests.exceptions.Timeout:
+            # 超时也计入样本，使 p95 反映真实的慢请求
+            _latency.record(endpoint, timeout)
+            raise
+        _latency.record(endpoint, time.monotonic() - start)
+        return response
+
+    def _cache_key(self, url: str, params: Optional[Dict[str, Any]]) -> str:
+        query = "&".join(f"{k}={params[k]}" for k in sorted(params)) if params else ""
+        return f"{self._token_key}|{url}?{query}"
+
+    @staticmethod
+    def _is_rate_limited(response: requests.Response) -> bool:
+        """429 与配额耗尽的 403 视为当前 token 被限流"""
+        if response.status_code == 429:
+            return True
+        return (
+            response.status_code == 403
+            and response.headers.get("X-RateLimit-Remaining") == "0"
+        )
+
+    @staticmethod
+    def _mark(response: requests.Response, from_cache: bool) -> requests.Response:
+        if from_cache:
+            # 缓存中的对象会被并发读取，浅拷贝后再打标记
+            response = copy.copy(response)
+        response.from_cache = from_cache
+        return response
@@ -2,13 +2,17 @@
 GitHub Project Search Skill
 搜索 GitHub 开源项目并获取部署相关信息
 """
+import copy
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 import requests
 
 from ...base import Skill, SkillContext, SkillResult, SkillStatus
 from ...registry import register_skill
+from .github_client import GitHubClient
+from .prefetch import get_warmer
+from .transport import apply_transport
 
 
 class GitHubProjectSearcher:
@@ -16,11 +20,7 @@ class GitHubProjectSearcher:
 
     def __init__(self, token: str):
         self.token = token
-        self.api_base = "https://api.github.com"
-        self.headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        self.client = GitHubClient(token)
 
     def search_projects(
         self,
@@ -44,7 +44,6 @@ class GitHubProjectSearcher:
         if language:
             search_query += f" language:{language}"
 
-        url = f"{self.api_base}/search/repositories"
         params = {
             "q": search_query,
             "sort": sort,
@@ -53,7 +52,7 @@ class GitHubProjectSearcher:
         }
 
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=10)
+            response = self.client.get("search", "/search/repositories", params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -92,31 +91,37 @@ class GitHubProjectSearcher:
             owner: 仓库所有者
             repo: 仓库名称
         """
-        url = f"{self.api_base}/repos/{owner}/{repo}"
+        repo_path = f"/repos/{owner}/{repo}"
 
         try:
             # 获取基本信息
-            response = requests.get(url, headers=self.headers, timeout=10)
+            response = self.client.get("repo", repo_path)
             response.raise_for_status()
             repo_data = response.json()
 
-            # 获取 README 内容
-            readme_url = f"{self.api_base}/repos/{owner}/{repo}/readme"
-            readme_response = requests.get(readme_url, headers=self.headers, timeout=10)
-
+            # 获取 README 内容；404 表示没有 README，其它失败表示未知
             readme_content = ""
-            if readme_response.status_code == 200:
-                readme_data = readme_response.json()
-                # README 内容是 base64 编码的
-                import base64
-                readme_content = base64.b64decode(readme_data["content"]).decode("utf-8")
+            readme_known = True
+            try:
+                readme_response = self.client.get("readme", f"{repo_path}/readme")
+                if readme_response.status_code == 200:
+                    readme_data = readme_response.json()
+                    # README 内容是 base64 编码的
+                    import base64
+                    readme_content = base64.b64decode(readme_data["content"]).decode("utf-8")
+                elif readme_response.status_code != 404:
+                    readme_known = False
+            except requests.exceptions.RequestException:
+                readme_known = False
 
             # 获取最新 release 信息
-            releases_url = f"{self.api_base}/repos/{owner}/{repo}/releases/latest"
-            releases_response = requests.get(releases_url, headers=self.headers, timeout=10)
-
             release_info = None
-            if releases_response.status_code == 200:
+            try:
+                releases_response = self.client.get("releases", f"{repo_path}/releases/latest")
+            except requests.exceptions.RequestException:
+                releases_response = None
+
+            if releases_response is not None and releases_response.status_code == 200:
                 release_data = releases_response.json()
                 release_info = {
                     "tag_name": release_data.get("tag_name"),
@@ -150,21 +155,83 @@ class GitHubProjectSearcher:
                 },
                 "readme": readme_content,
                 "latest_release": release_info,
-                "deployment_hints": self._extract_deployment_info(readme_content)
+                "deployment_hints": self._extract_deployment_info(readme_content, readme_known)
             }
 
         except requests.exceptions.RequestException as e:
             return {"error": f"获取项目详情失败: {str(e)}"}
 
-    def _extract_deployment_info(self, readme: str) -> Dict[str, Any]:
-        """从 README 中提取部署相关信息"""
+    def search(
+        self,
+        query: str,
+        language: Optional[str] = None,
+        sort_by: str = "stars",
+        max_results: int = 10,
+        get_details: bool = False
+    ) -> Dict[str, Any]:
+        """
+        搜索项目并按需获取前 3 个项目的详情
+
+        Returns:
+            结果字典；失败时包含 error 字段
+        """
+        projects = self.search_projects(
+            query=query,
+            language=language,
+            sort=sort_by,
+            per_page=max_results
+        )
+
+        if isinstance(projects, dict) and "error" in projects:
+            return projects
+
+        result = {
+            "query": query,
+            "total_count": len(projects),
+            "projects": projects,
+            "generated_at": datetime.now().isoformat()
+        }
+
+        # 如果需要详细信息，获取前3个项目的详情
+        if get_details and projects:
+            detailed_projects = []
+            for project in projects[:3]:
+                owner, repo = project["full_name"].split("/")
+                details = self.get_project_details(owner, repo)
+                if "error" not in details:
+                    project["details"] = details
+                detailed_projects.append(project)
+
+            result["projects"] = detailed_projects
+
+        return result
+
+    def _extract_deployment_info(self, readme: str, known: bool = True) -> Dict[str, Any]:
+        """
+        从 README 中提取部署相关信息
+
+        README 获取失败时（known=False）各项提示为 None，表示"未知"而非"不存在"，
+        并在 unknown 字段中列出。
+        """
+        if not known:
+            return {
+                "has_dockerfile": None,
+                "has_docker_compose": None,
+                "has_kubernetes": None,
+                "has_ci_cd": None,
+                "deployment_keywords": [],
+                "env_vars": [],
+                "unknown": ["has_dockerfile", "has_docker_compose", "has_kubernetes", "has_ci_cd"]
+            }
+
         hints = {
             "has_dockerfile": "Dockerfile" in readme or "docker" in readme.lower(),
             "has_docker_compose": "docker-compose" in readme.lower(),
             "has_kubernetes": "kubernetes" in readme.lower() or "k8s" in readme.lower(),
             "has_ci_cd": any(keyword in readme.lower() for keyword in ["github actions", "gitlab ci", "jenkins", "workflow"]),
             "deployment_keywords": [],
-            "env_vars": []
+            "env_vars": [],
+            "unknown": []
         }
 
         # 查找常见的部署关键词
@@ -210,7 +277,8 @@ class GitHubProjectSearchSkill(Skill):
             "language": {"type": "string", "description": "编程语言过滤，如 'Python', 'JavaScript'"},
             "sort_by": {"type": "string", "description": "排序方式: stars/forks/updated", "default": "stars"},
             "max_results": {"type": "integer", "description": "返回结果数量，默认 10", "default": 10},
-            "get_details": {"type": "boolean", "description": "是否获取详细信息（包括 README 和部署信息）", "default": False}
+            "get_details": {"type": "boolean", "description": "是否获取详细信息（包括 README 和部署信息）", "default": False},
+            "response_format": {"type": "string", "description": "projects 编码格式: json(默认)/columnar/msgpack", "default": "json"}
         }
 
     @property
@@ -266,47 +334,51 @@ class GitHubProjectSearchSkill(Skill):
             sort_by = context.params.get("sort_by", "stars")
             max_results = context.params.get("max_results", 10)
             get_details = context.params.get("get_details", False)
+            search_params = {
+                "query": query,
+                "language": language,
+                "sort_by": sort_by,
+                "max_results": max_results,
+                "get_details": get_details
+            }
 
-            # 获取 GitHub token (从环境变量)
-            token = context.params.get("github_token") or os.environ.get(
-                "GITHUB_TOKEN", ""
-            )
-
-            searcher = GitHubProjectSearcher(token)
-
-            # 搜索项目
-            projects = searcher.search_projects(
-                query=query,
-                language=language,
-                sort=sort_by,
-                per_page=max_results
-            )
-
-            if isinstance(projects, dict) and "error" in projects:
-                return SkillResult(
-                    status=SkillStatus.ERROR,
-                    error=projects["error"]
+            # 使用默认 token 的请求参与预热；显式传入 token 的请求不共享缓存
+            warmer = None if context.params.get("github_token") else get_warmer()
+            result = None
+            if warmer is not None:
+                warmer.register(
+                    self.name,
+                    self._load_for_prefetch,
+                    estimate_cost=self._estimate_prefetch_cost,
+                    available=self._prefetch_available
+                )
+                result = warmer.lookup(self.name, search_params)
+                if result is not None:
+                    # 缓存键忽略大小写和空白，返回调用方自己的查询写法
+                    result = copy.deepcopy(result)
+                    result["query"] = query
+
+            cache_hit = result is not None
+            if result is None:
+                # 获取 GitHub token (从环境变量)
+                token = context.params.get("github_token") or os.environ.get(
+                    "GITHUB_TOKEN", ""
                 )
 
-            # 构建结果
-            result = {
-                "query": query,
-                "total_count": len(projects),
-                "projects": projects,
-                "generated_at": datetime.now().isoformat()
-            }
+                searcher = GitHubProjectSearcher(token)
+                result = searcher.search(**search_params)
 
-            # 如果需要详细信息，获取前3个项目的详情
-            if get_details and projects:
-                detailed_projects = []
-                for project in projects[:3]:
-                    owner, repo = project["full_name"].split("/")
-                    details = searcher.get_project_details(owner, repo)
-                    if "error" not in details:
-                        project["details"] = details
-                    detailed_projects.append(project)
+                if "error" in result:
+                    return SkillResult(
+                        status=SkillStatus.ERROR,
+                        error=result["error"]
+                    )
 
-                result["projects"] = detailed_projects
+                if warmer is not None:
+                    warmer.store(self.name, search_params, copy.deepcopy(result))
+
+            # 按客户端协商的格式编码 projects
+            result, transport = apply_transport(result, context.params.get("response_format"))
 
             # 计算执行时间
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
@@ -314,13 +386,15 @@ class GitHubProjectSearchSkill(Skill):
             return SkillResult(
                 status=SkillStatus.SUCCESS,
                 data=result,
-                message=f"成功找到 {len(projects)} 个项目",
+                message=f"成功找到 {result['total_count']} 个项目",
                 execution_time_ms=execution_time,
                 metadata={
                     "query": query,
                     "language": language,
                     "sort_by": sort_by,
-                    "has_details": get_details
+                    "has_details": get_details,
+                    "cache_hit": cache_hit,
+                    "transport": transport
                 }
             )
 
@@ -331,3 +405,21 @@ class GitHubProjectSearchSkill(Skill):
                 error=str(e),
                 execution_time_ms=execution_time
             )
+
+    @staticmethod
+    def _load_for_prefetch(params: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], int]:
+        """预热器回调：使用默认 token 重新执行搜索，返回 (结果, 实际 API 请求数)，失败时结果为 None"""
+        searcher = GitHubProjectSearcher(os.environ.get("GITHUB_TOKEN", ""))
+        result = searcher.search(**params)
+        return (None if "error" in result else result), searcher.client.requests_sent
+
+    @staticmethod
+    def _estimate_prefetch_cost(params: Dict[str, Any]) -> int:
+        """预估一次预热消耗的 GitHub API 请求数"""
+        # 1 次搜索；获取详情时前 3 个项目各需 repo / readme / releases 3 次请求
+        return 1 + (9 if params.get("get_details") else 0)
+
+    @staticmethod
+    def _prefetch_available() -> bool:
+        """GitHub 熔断期间跳过预热"""
+        return GitHubClient(os.environ.get("GITHUB_TOKEN", "")).is_available()
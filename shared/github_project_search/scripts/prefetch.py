@@ -0,0 +1,237 @@
+"""
+Prefetch / Cache Warming
+从近期流量中学习热门查询，在缓存过期前于后台重新执行，使热门请求命中预热缓存
+"""
+import json
+import os
+import threading
+import time
+from collections import deque, Counter
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+
+# 加载函数返回 (结果, 实际消耗的上游 API 请求数)，结果为 None 表示加载失败
+Loader = Callable[[Dict[str, Any]], Tuple[Optional[Dict[str, Any]], int]]
+CostEstimator = Callable[[Dict[str, Any]], int]
+
+
+def normalize_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """规范化请求参数（仅用于生成缓存键）：字符串去首尾空白、合并空白并转小写"""
+    normalized = {}
+    for key, value in params.items():
+        if isinstance(value, str):
+            value = " ".join(value.split()).lower()
+        normalized[key] = value
+    return normalized
+
+
+def make_key(namespace: str, params: Dict[str, Any]) -> str:
+    return f"{namespace}:{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+
+
+class QueryTracker:
+    """统计时间窗口内各规范化请求的出现次数"""
+
+    def __init__(self, window_seconds: float = 3600.0, max_events: int = 10000):
+        self.window_seconds = window_seconds
+        self._events: deque = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+
+    def record(self, key: str) -> None:
+        with self._lock:
+            self._events.append((time.monotonic(), key))
+
+    def counts(self) -> Counter:
+        """返回窗口内各请求的出现次数"""
+        cutoff = time.monotonic() - self.window_seconds
+        with self._lock:
+            while self._events and self._events[0][0] < cutoff:
+                self._events.popleft()
+            return Counter(key for _, key in self._events)
+
+    def top(self, n: int, min_hits: int = 1) -> List[str]:
+        """出现次数不少于 min_hits 的前 n 个请求"""
+        return [key for key, count in self.counts().most_common(n) if count >= min_hits]
+
+
+class WarmCache:
+    """结果级 TTL 缓存"""
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            return None
+        return entry[1]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                del self._entries[oldest]
+            self._entries[key] = (time.monotonic(), value)
+
+    def expires_in(self, key: str) -> float:
+        """距离过期的秒数，不存在时返回 0"""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return 0.0
+        return entry[0] + self.ttl - time.monotonic()
+
+
+class CacheWarmer:
+    """
+    后台缓存预热器
+
+    - 技能通过 register() 注册命名空间、加载函数、预估开销和可用性检查
+    - lookup() 记录一次请求并返回预热结果（未命中返回 None）
+    - 后台线程定期挑选窗口内至少出现 min_hits 次的前 top_k 个请求，
+      在过期前 refresh_ahead 秒内用原始参数重新执行
+    - 预算按上游 API 请求数计：每小时最多 budget_per_hour 次，
+      预估开销超出剩余预算或上游不可用（如熔断中）时跳过
+    """
+
+    def __init__(
+        self,
+        ttl: float = 600.0,
+        refresh_ahead: float = 120.0,
+        top_k: int = 20,
+        min_hits: int = 2,
+        budget_per_hour: int = 120,
+        interval: float = 30.0
+    ):
+        self.refresh_ahead = refresh_ahead
+        self.top_k = top_k
+        self.min_hits = min_hits
+        self.budget_per_hour = budget_per_hour
+        self.interval = interval
+        self.cache = WarmCache(ttl=ttl)
+        self.tracker = QueryTracker()
+        self._loaders: Dict[str, Tuple[Loader, CostEstimator, Callable[[], bool]]] = {}
+        self._params: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._spent: deque = deque()
+        self._spent_total = 0
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(
+        self,
+        namespace: str,
+        loader: Loader,
+        estimate_cost: CostEstimator = lambda params: 1,
+        available: Callable[[], bool] = lambda: True
+    ) -> None:
+        with self._lock:
+            self._loaders[namespace] = (loader, estimate_cost, available)
+        self.start()
+
+    def lookup(self, namespace: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = make_key(namespace, normalize_params(params))
+        with self._lock:
+            # 保存原始参数，预热时按调用方的原始写法重放
+            self._params[key] = (namespace, dict(params))
+        self.tracker.record(key)
+        return self.cache.get(key)
+
+    def store(self, namespace: str, params: Dict[str, Any], value: Dict[str, Any]) -> None:
+        self.cache.set(make_key(namespace, normalize_params(params)), value)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-warmer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def refresh_once(self) -> int:
+        """执行一轮预热，返回本轮刷新的条目数"""
+        counts = self.tracker.counts()
+        with self._lock:
+            # 清理已滑出统计窗口的请求参数，避免长期运行时无限增长
+            for key in [k for k in self._params if k not in counts]:
+                del self._params[key]
+
+        refreshed = 0
+        for key, count in counts.most_common(self.top_k):
+            if count < self.min_hits:
+                break
+            if self.cache.expires_in(key) > self.refresh_ahead:
+                continue
+            with self._lock:
+                namespace, params = self._params.get(key, (None, None))
+                registered = self._loaders.get(namespace)
+            if registered is None:
+                continue
+            loader, estimate_cost, available = registered
+            if not available():
+                continue
+            estimate = estimate_cost(params)
+            if estimate > self.remaining_budget():
+                continue
+            try:
+                value, cost = loader(dict(params))
+            except Exception:
+                value, cost = None, estimate
+            self._charge(cost)
+            if value is not None:
+                self.cache.set(key, value)
+                refreshed += 1
+        return refreshed
+
+    def remaining_budget(self) -> int:
+        """最近一小时内剩余的上游 API 请求数"""
+        now = time.monotonic()
+        with self._lock:
+            while self._spent and now - self._spent[0][0] > 3600:
+                self._spent_total -= self._spent.popleft()[1]
+            return self.budget_per_hour - self._spent_total
+
+    def _charge(self, cost: int) -> None:
+        with self._lock:
+            self._spent.append((time.monotonic(), cost))
+            self._spent_total += cost
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.refresh_once()
+
+
+_warmer: Optional[CacheWarmer] = None
+_warmer_lock = threading.Lock()
+
+
+def get_warmer() -> Optional[CacheWarmer]:
+    """
+    获取进程级预热器
+
+    通过环境变量配置：
+        SKILL_PREFETCH_ENABLED: 设为 0 关闭预热（默认开启）
+        SKILL_PREFETCH_TOP_K: 预热的热门请求数量（默认 20）
+        SKILL_PREFETCH_MIN_HITS: 一小时内至少出现多少次才参与预热（默认 2）
+        SKILL_PREFETCH_BUDGET: 每小时预热最多发出的 GitHub API 请求数（默认 120）
+        SKILL_PREFETCH_TTL: 预热结果有效期，秒（默认 600）
+    """
+    global _warmer
+    if os.environ.get("SKILL_PREFETCH_ENABLED", "1") == "0":
+        return None
+    with _warmer_lock:
+        if _warmer is None:
+            _warmer = CacheWarmer(
+                ttl=float(os.environ.get("SKILL_PREFETCH_TTL", 600)),
+                top_k=int(os.environ.get("SKILL_PREFETCH_TOP_K", 20)),
+                min_hits=int(os.environ.get("SKILL_PREFETCH_MIN_HITS", 2)),
+                budget_per_hour=int(os.environ.get("SKILL_PREFETCH_BUDGET", 120))
+            )
+        return _warmer
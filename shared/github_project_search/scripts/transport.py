@@ -0,0 +1,150 @@
+"""
+Result Transport
+projects 数组的列式编码与可选的 msgpack 压缩格式，按客户端协商使用，默认仍为 JSON
+"""
+import base64
+import zlib
+from typing import Dict, Any, List, Tuple
+
+try:
+    import msgpack
+except ImportError:  # 可选依赖，未安装时回退为列式 JSON
+    msgpack = None
+
+
+FORMAT_JSON = "json"
+FORMAT_COLUMNAR = "columnar"
+FORMAT_MSGPACK = "msgpack"
+SUPPORTED_FORMATS = [FORMAT_JSON, FORMAT_COLUMNAR, FORMAT_MSGPACK]
+
+# 取值重复度高的字段做字典编码：标量字段存下标，列表字段存下标列表
+DICTIONARY_FIELDS = ["language", "license", "topics", "deployment"]
+
+
+def encode_columnar(projects: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    将项目列表编码为列式结构
+
+    Returns:
+        {
+            "length": 项目数,
+            "fields": 字段名列表（按首次出现顺序）,
+            "columns": {字段名: 值列表}，缺失值占位为 None,
+            "dictionaries": {字段名: 去重后的取值列表},
+            "missing": {字段名: 缺少该字段的行号列表}，仅包含有缺失的字段
+        }
+
+    decode_columnar(encode_columnar(projects)) == projects
+    """
+    fields: List[str] = []
+    for project in projects:
+        for key in project:
+            if key not in fields:
+                fields.append(key)
+
+    columns: Dict[str, List[Any]] = {}
+    dictionaries: Dict[str, List[Any]] = {}
+    missing: Dict[str, List[int]] = {}
+    for field in fields:
+        absent = [row for row, project in enumerate(projects) if field not in project]
+        if absent:
+            missing[field] = absent
+        values = [project.get(field) for project in projects]
+        if field in DICTIONARY_FIELDS:
+            values, dictionaries[field] = _dictionary_encode(values)
+        columns[field] = values
+
+    return {
+        "length": len(projects),
+        "fields": fields,
+        "columns": columns,
+        "dictionaries": dictionaries,
+        "missing": missing
+    }
+
+
+def decode_columnar(table: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """encode_columnar 的逆操作，缺失的字段不会出现在还原后的项目中"""
+    columns = dict(table["columns"])
+    for field, dictionary in table.get("dictionaries", {}).items():
+        columns[field] = [
+            [dictionary[i] for i in value] if isinstance(value, list)
+            else (dictionary[value] if value is not None else None)
+            for value in columns[field]
+        ]
+
+    missing = {field: set(rows) for field, rows in table.get("missing", {}).items()}
+    projects = []
+    for row in range(table["length"]):
+        projects.append({
+            field: columns[field][row]
+            for field in table["fields"]
+            if row not in missing.get(field, ())
+        })
+    return projects
+
+
+def pack(table: Dict[str, Any]) -> str:
+    """
+    列式结构 -> msgpack -> zlib 压缩 -> base64
+
+    SkillResult.data 会以 JSON 传给 UI，二进制需以 base64 文本承载
+    """
+    return base64.b64encode(zlib.compress(msgpack.packb(table, use_bin_type=True))).decode("ascii")
+
+
+def unpack(blob: str) -> Dict[str, Any]:
+    return msgpack.unpackb(zlib.decompress(base64.b64decode(blob)), raw=False)
+
+
+def negotiate_format(requested: Any) -> str:
+    """解析客户端请求的格式；未知格式回退为 JSON，msgpack 不可用时回退为列式 JSON"""
+    fmt = str(requested or FORMAT_JSON).lower()
+    if fmt not in SUPPORTED_FORMATS:
+        return FORMAT_JSON
+    if fmt == FORMAT_MSGPACK and msgpack is None:
+        return FORMAT_COLUMNAR
+    return fmt
+
+
+def apply_transport(result: Dict[str, Any], requested: Any) -> Tuple[Dict[str, Any], str]:
+    """
+    按协商的格式编码结果中的 projects 数组
+
+    json 格式原样返回；其它格式移除 projects，改为 projects_columnar
+    （列式字典或 msgpack+zlib 的 base64 文本），并写入 transport 字段说明编码方式。
+
+    Returns:
+        (编码后的结果, 实际使用的格式)
+    """
+    fmt = negotiate_format(requested)
+    if fmt == FORMAT_JSON or "projects" not in result:
+        return result, FORMAT_JSON
+
+    encoded = dict(result)
+    table = encode_columnar(encoded.pop("projects"))
+    if fmt == FORMAT_MSGPACK:
+        encoded["projects_columnar"] = pack(table)
+        encoded["transport"] = "columnar+msgpack+zlib+base64"
+    else:
+        encoded["projects_columnar"] = table
+        encoded["transport"] = "columnar"
+    return encoded, fmt
+
+
+def _dictionary_encode(values: List[Any]) -> Tuple[List[Any], List[Any]]:
+    dictionary: List[Any] = []
+    index: Dict[Any, int] = {}
+
+    def code(value: Any) -> int:
+        if value not in index:
+            index[value] = len(dictionary)
+            dictionary.append(value)
+        return index[value]
+
+    encoded = [
+        [code(v) for v in value] if isinstance(value, list)
+        else (code(value) if value is not None else None)
+        for value in values
+    ]
+    return encoded, dictionary
@@ -0,0 +1,7 @@
+import os
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+# 技能包依赖宿主的 base / registry，测试直接从 scripts 目录导入不依赖宿主的模块
+sys.path.insert(0, os.path.join(ROOT, "shared", "github_project_search", "scripts"))
@@ -0,0 +1,169 @@
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import types
+
+import pytest
+import yaml
+
+SKILL_DIR = os.path.join(os.path.dirname(__file__), "..", "1", "skills", "baidu-hotsearch")
+
+
+def load_script():
+    with open(os.path.join(SKILL_DIR, "workflow.yaml"), encoding="utf-8") as f:
+        workflow = yaml.safe_load(f)
+    return workflow["steps"][0]["params"]["script"]
+
+
+class FakeResponse:
+    def __init__(self, words):
+        self.words = words
+
+    def json(self):
+        return {"data": {"cards": [{"content": [{"word": w, "url": f"u/{w}"} for w in self.words]}]}}
+
+
+def run_script(monkeypatch, tmp_path, words, env=None):
+    """像 toolbox_execute 一样在顶层执行脚本，上游请求替换为固定榜单，缓存目录指向 tmp_path"""
+    fake_requests = types.ModuleType("requests")
+    fake_requests.get = lambda *args, **kwargs: FakeResponse(words)
+    monkeypatch.setitem(sys.modules, "requests", fake_requests)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    for name in ("HOTSEARCH_MODE", "HOTSEARCH_SINCE", "HOTSEARCH_START", "HOTSEARCH_END"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("BAIDU_HOTSEARCH_CACHE_TTL", "0")
+    for name, value in (env or {}).items():
+        monkeypatch.setenv(name, value)
+
+    output = io.StringIO()
+    # exec 的全新全局命名空间中 __name__ 解析为 builtins，脚本仍需在顶层执行
+    namespace = {}
+    with contextlib.redirect_stdout(output):
+        exec(compile(load_script(), "baidu_hotsearch", "exec"), namespace)
+    return json.loads(output.getvalue()), namespace
+
+
+@pytest.fixture
+def hotsearch(monkeypatch, tmp_path):
+    # 空榜单不写日志，直接调用 append_snapshot 的测试需要先建好目录
+    _, namespace = run_script(monkeypatch, tmp_path, [])
+    os.makedirs(namespace["cache_dir"], exist_ok=True)
+    return namespace
+
+
+def board(*titles):
+    return [{"rank": i, "title": t, "url": f"u/{t}"} for i, t in enumerate(titles, 1)]
+
+
+def test_skill_md_matches_workflow():
+    with open(os.path.join(SKILL_DIR, "workflow.yaml"), encoding="utf-8") as f:
+        workflow = f.read()
+    with open(os.path.join(SKILL_DIR, "SKILL.md"), encoding="utf-8") as f:
+        assert workflow in f.read()
+
+
+def test_diff_boards(hotsearch):
+    entered, exited, moved = hotsearch["diff_boards"](board("a", "b", "c"), board("b", "a", "d"))
+    assert entered == [[3, "d", "u/d"]]
+    assert exited == [[3, "c"]]
+    assert sorted(moved) == [["a", 1, 2], ["b", 2, 1]]
+
+
+def test_diff_boards_unchanged(hotsearch):
+    assert hotsearch["diff_boards"](board("a", "b"), board("a", "b")) == ([], [], [])
+
+
+@pytest.mark.parametrize("env", [
+    {"HOTSEARCH_MODE": "bogus"},
+    {"HOTSEARCH_MODE": "changes", "HOTSEARCH_SINCE": '1")\nimport os'},
+    {"HOTSEARCH_MODE": "changes", "HOTSEARCH_SINCE": "-1"},
+    {"HOTSEARCH_START": "yesterday"},
+])
+def test_parse_inputs_rejects_invalid(hotsearch, env):
+    with pytest.raises(ValueError):
+        hotsearch["parse_inputs"](env)
+
+
+def test_parse_inputs_defaults(hotsearch):
+    assert hotsearch["parse_inputs"]({}) == {"mode": "latest", "since": None, "start": None, "end": None}
+    inputs = hotsearch["parse_inputs"]({"HOTSEARCH_MODE": "changes", "HOTSEARCH_SINCE": "7", "HOTSEARCH_END": "100"})
+    assert (inputs["since"], inputs["end"]) == (7, 100.0)
+
+
+def test_concurrent_appends_get_unique_seq(hotsearch):
+    def append(i):
+        with hotsearch["log_lock"]():
+            hotsearch["append_snapshot"](board(f"old{i}"), board(f"new{i}"))
+
+    threads = [threading.Thread(target=append, args=(i,)) for i in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    seqs = [r["seq"] for r in hotsearch["load_log"]()]
+    assert sorted(seqs) == list(range(1, 21))
+    assert hotsearch["read_head"]()["seq"] == 20
+
+
+def test_compaction_keeps_recent_records_after_baseline(hotsearch):
+    hotsearch["log_max_records"] = 4
+    boards = [board(), board("a", "b"), board("b", "a"), board("c"), board("d"), board("e")]
+    for old, new in zip(boards, boards[1:]):
+        hotsearch["append_snapshot"](old, new)
+
+    records = hotsearch["load_log"]()
+    assert [r["seq"] for r in records] == [3, 4, 5]
+    assert records[0]["baseline"] is True
+    assert records[0]["entered"] == [[1, "c", "u/c"]]
+    assert hotsearch["replay"](records) == {"e": [1, "u/e"]}
+
+    head = hotsearch["read_head"]()
+    assert (head["seq"], head["count"], head["baseline_seq"]) == (5, 3, 3)
+
+    changes = hotsearch["board_changes"]({"hotsearch_list": board("e")}, since=1)
+    assert changes["reset"] is True
+    changes = hotsearch["board_changes"]({"hotsearch_list": board("e")}, since=3)
+    assert changes["reset"] is False
+    assert [r["seq"] for r in changes["changes"]] == [4, 5]
+    changes = hotsearch["board_changes"]({"hotsearch_list": board("e")}, start=0)
+    assert changes["reset"] is True
+
+
+def test_default_call_runs_at_top_level(monkeypatch, tmp_path):
+    env = {"HOTSEARCH_MODE": "{{input.mode}}", "HOTSEARCH_SINCE": "None", "HOTSEARCH_START": "null"}
+    output, _ = run_script(monkeypatch, tmp_path, ["a", "b"], env)
+    assert output["status"] == "success"
+    assert [item["title"] for item in output["hotsearch_list"]] == ["a", "b"]
+    assert output["token"] == 1
+
+
+def test_changes_mode_end_to_end(monkeypatch, tmp_path):
+    run_script(monkeypatch, tmp_path, ["a", "b"])
+    output, _ = run_script(monkeypatch, tmp_path, ["b", "c"], {"HOTSEARCH_MODE": "changes", "HOTSEARCH_SINCE": "1"})
+    assert output["token"] == 2
+    assert output["changes"][0]["entered"] == [[2, "c", "u/c"]]
+
+
+def test_invalid_input_reports_error(monkeypatch, tmp_path):
+    output, _ = run_script(monkeypatch, tmp_path, ["a"], {"HOTSEARCH_SINCE": '1")'})
+    assert output["status"] == "error"
+
+
+def test_board_changes_token_matches_records_after_concurrent_append(hotsearch):
+    hotsearch["append_snapshot"](board(), board("a"))
+    original_load_log = hotsearch["load_log"]
+
+    def load_log_after_append():
+        # 模拟另一次调用在读取 head 之后、读取日志之前追加了一条记录
+        hotsearch["append_snapshot"](board("a"), board("b"))
+        return original_load_log()
+
+    hotsearch["load_log"] = load_log_after_append
+    changes = hotsearch["board_changes"]({"hotsearch_list": board("b")}, since=0)
+    assert [r["seq"] for r in changes["changes"]] == [1, 2]
+    assert changes["token"] == 2
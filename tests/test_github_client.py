@@ -0,0 +1,229 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import github_client
+from github_client import CircuitBreaker, CircuitOpenError, GitHubClient
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_circuit_breaker_opens_after_threshold():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+
+
+def test_circuit_breaker_half_open_probe_closes_on_success():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    # 探测期间其余请求继续快速失败
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+
+def test_circuit_breaker_half_open_probe_reopens_on_failure():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.05)
+    for _ in range(3):
+        breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def _prime_latency(endpoint, seconds):
+    for _ in range(10):
+        github_client._latency.record(endpoint, seconds)
+
+
+def test_hedged_get_returns_first_winner(monkeypatch):
+    endpoint = "test-hedge-winner"
+    _prime_latency(endpoint, 0.05)
+    calls = []
+
+    def fake_timed_get(self, endpoint, url, params, timeout):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return "primary"
+        return "hedge"
+
+    monkeypatch.setattr(GitHubClient, "_timed_get", fake_timed_get)
+    client = GitHubClient("token")
+
+    start = time.monotonic()
+    assert client._hedged_get(endpoint, "https://example.test", None) == "hedge"
+    assert time.monotonic() - start < 0.4
+    assert len(calls) == 2
+
+
+def test_hedged_get_no_hedge_without_samples(monkeypatch):
+    calls = []
+
+    def fake_timed_get(self, endpoint, url, params, timeout):
+        calls.append(timeout)
+        return "primary"
+
+    monkeypatch.setattr(GitHubClient, "_timed_get", fake_timed_get)
+    client = GitHubClient("token", default_timeout=7)
+
+    assert client._hedged_get("test-hedge-cold", "https://example.test", None) == "primary"
+    assert calls == [7]
+
+
+def test_hedged_get_timeout_bounded_by_adaptive_timeout(monkeypatch):
+    endpoint = "test-hedge-timeout"
+    _prime_latency(endpoint, 0.1)
+
+    def fake_timed_get(self, endpoint, url, params, timeout):
+        time.sleep(1.0)
+        return "late"
+
+    monkeypatch.setattr(GitHubClient, "_timed_get", fake_timed_get)
+    client = GitHubClient("token")
+    client.MIN_TIMEOUT = 0.2
+    client.MAX_TIMEOUT = 0.2
+
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.Timeout):
+        client._hedged_get(endpoint, "https://example.test", None)
+    # 总耗时不超过自适应超时（不叠加对冲等待时间）
+    assert time.monotonic() - start < 0.3
+
+
+def test_hedged_get_raises_request_error(monkeypatch):
+    def fake_timed_get(self, endpoint, url, params, timeout):
+        raise requests.exceptions.ConnectionError("boom")
+
+    monkeypatch.setattr(GitHubClient, "_timed_get", fake_timed_get)
+    client = GitHubClient("token")
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client._hedged_get("test-hedge-error", "https://example.test", None)
+
+
+def test_rate_limit_opens_circuit_only_for_that_token(monkeypatch):
+    def fake_hedged_get(self, endpoint, url, params):
+        if self.token == "limited":
+            return FakeResponse(403, {"X-RateLimit-Remaining": "0"})
+        return FakeResponse(404)
+
+    monkeypatch.setattr(GitHubClient, "_hedged_get", fake_hedged_get)
+    limited = GitHubClient("limited")
+    other = GitHubClient("other")
+
+    assert limited.get("test", "/rate-limit-a").status_code == 403
+    with pytest.raises(CircuitOpenError):
+        limited.get("test", "/rate-limit-b")
+    assert other.get("test", "/rate-limit-b").status_code == 404
+
+
+@pytest.fixture
+def fresh_breakers(monkeypatch):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    monkeypatch.setattr(github_client, "_breaker", breaker)
+    monkeypatch.setattr(github_client, "_rate_limit_breakers", {})
+    return breaker
+
+
+def test_rate_limited_token_does_not_consume_global_probe(monkeypatch, fresh_breakers):
+    def fake_hedged_get(self, endpoint, url, params):
+        return FakeResponse(404)
+
+    monkeypatch.setattr(GitHubClient, "_hedged_get", fake_hedged_get)
+    limited = GitHubClient("limited-probe")
+    other = GitHubClient("other-probe")
+    github_client._rate_limit_breaker(limited._token_key).record_failure()
+    fresh_breakers.record_failure()
+    time.sleep(0.06)
+
+    # 被限流的 token 快速失败，且不占用全局熔断器的半开探测
+    with pytest.raises(CircuitOpenError):
+        limited.get("test", "/probe-a")
+    assert fresh_breakers._state == CircuitBreaker.OPEN
+
+    assert other.get("test", "/probe-b").status_code == 404
+    assert fresh_breakers.state == CircuitBreaker.CLOSED
+
+
+def test_rate_limited_probe_resolves_global_breaker(monkeypatch, fresh_breakers):
+    def fake_hedged_get(self, endpoint, url, params):
+        return FakeResponse(429)
+
+    monkeypatch.setattr(GitHubClient, "_hedged_get", fake_hedged_get)
+    client = GitHubClient("probe-429")
+    fresh_breakers.record_failure()
+    time.sleep(0.06)
+
+    assert client.get("test", "/probe-c").status_code == 429
+    # GitHub 可达，全局熔断器关闭；只有当前 token 被限流
+    assert fresh_breakers.state == CircuitBreaker.CLOSED
+    assert not client.is_available()
+
+
+def test_cache_only_served_when_degraded(monkeypatch, fresh_breakers):
+    statuses = iter([200, 200, 503])
+    calls = []
+
+    def fake_hedged_get(self, endpoint, url, params):
+        calls.append(url)
+        return FakeResponse(next(statuses))
+
+    monkeypatch.setattr(GitHubClient, "_hedged_get", fake_hedged_get)
+    client = GitHubClient("cache-token")
+
+    first = client.get("test", "/cached")
+    second = client.get("test", "/cached")
+    # GitHub 正常时每次都发出实时请求
+    assert len(calls) == 2 and not second.from_cache
+    degraded = client.get("test", "/cached")
+    assert degraded.from_cache and degraded.status_code == 200
+    assert first.from_cache is False
+
+
+def test_endpoint_timeouts_override_default_and_max():
+    client = GitHubClient("token", default_timeout=15, endpoint_timeouts={"contents-test": (5.0, 5.0)})
+    assert client.timeout_for("contents-test") == 5.0
+    assert client.timeout_for("search-test-cold") == 15
+
+    _prime_latency("contents-test", 4.0)
+    assert client.timeout_for("contents-test") == 5.0
+    _prime_latency("search-test-slow", 10.0)
+    assert client.timeout_for("search-test-slow") == client.MAX_TIMEOUT
+
+
+def test_hedged_get_cancels_queued_requests(monkeypatch):
+    endpoint = "test-hedge-cancel"
+    _prime_latency(endpoint, 0.05)
+    blocker = threading.Event()
+    # 占满线程池，使对冲请求只能排队
+    busy = [github_client._executor.submit(blocker.wait) for _ in range(8)]
+
+    client = GitHubClient("token")
+    client.MIN_TIMEOUT = 0.2
+    client.MAX_TIMEOUT = 0.2
+    try:
+        with pytest.raises(requests.exceptions.Timeout):
+            client._hedged_get(endpoint, "https://example.test", None)
+        assert client.requests_sent == 0
+    finally:
+        blocker.set()
+        for future in busy:
+            future.result()
+    time.sleep(0.05)
+    assert client.requests_sent == 0
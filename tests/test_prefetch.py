@@ -0,0 +1,96 @@
+from prefetch import CacheWarmer, make_key, normalize_params
+
+
+def make_warmer(**kwargs):
+    options = dict(ttl=600, refresh_ahead=120, top_k=10, min_hits=1, budget_per_hour=10, interval=3600)
+    options.update(kwargs)
+    warmer = CacheWarmer(**options)
+    # 测试中手动调用 refresh_once，不启动后台线程
+    warmer.start = lambda: None
+    return warmer
+
+
+def test_refresh_once_replays_original_params():
+    warmer = make_warmer()
+    calls = []
+    warmer.register("ns", lambda params: (calls.append(params) or {"query": params["query"]}, 1))
+    warmer.lookup("ns", {"query": "LangChain  Agent"})
+
+    assert warmer.refresh_once() == 1
+    assert calls == [{"query": "LangChain  Agent"}]
+    # 大小写与空白不同的请求命中同一个缓存键
+    assert warmer.lookup("ns", {"query": "langchain agent"}) == {"query": "LangChain  Agent"}
+
+
+def test_refresh_once_charges_actual_cost_against_budget():
+    warmer = make_warmer(budget_per_hour=10)
+    calls = []
+    warmer.register(
+        "ns",
+        lambda params: (calls.append(params["query"]) or {}, 4),
+        estimate_cost=lambda params: 4
+    )
+    for query in ["a", "b", "c"]:
+        warmer.lookup("ns", {"query": query})
+
+    # 预算 10：前两个各消耗 4，第三个预估 4 超出剩余的 2，跳过
+    assert warmer.refresh_once() == 2
+    assert len(calls) == 2
+    assert warmer.remaining_budget() == 2
+
+
+def test_refresh_once_charges_failed_loads():
+    warmer = make_warmer(budget_per_hour=5)
+
+    def failing_loader(params):
+        raise RuntimeError("boom")
+
+    warmer.register("ns", failing_loader, estimate_cost=lambda params: 3)
+    warmer.lookup("ns", {"query": "a"})
+
+    assert warmer.refresh_once() == 0
+    assert warmer.remaining_budget() == 2
+
+
+def test_refresh_once_requires_min_hits():
+    warmer = make_warmer(min_hits=2)
+    calls = []
+    warmer.register("ns", lambda params: (calls.append(params["query"]) or {}, 1))
+    warmer.lookup("ns", {"query": "once"})
+    warmer.lookup("ns", {"query": "twice"})
+    warmer.lookup("ns", {"query": "twice"})
+
+    warmer.refresh_once()
+    assert calls == ["twice"]
+
+
+def test_refresh_once_skips_unavailable_upstream():
+    warmer = make_warmer()
+    calls = []
+    warmer.register("ns", lambda params: (calls.append(params) or {}, 1), available=lambda: False)
+    warmer.lookup("ns", {"query": "a"})
+
+    assert warmer.refresh_once() == 0
+    assert calls == []
+    assert warmer.remaining_budget() == 10
+
+
+def test_refresh_once_skips_fresh_entries():
+    warmer = make_warmer()
+    calls = []
+    warmer.register("ns", lambda params: (calls.append(params) or {}, 1))
+    warmer.lookup("ns", {"query": "a"})
+    warmer.store("ns", {"query": "a"}, {"cached": True})
+
+    assert warmer.refresh_once() == 0
+    assert calls == []
+
+
+def test_refresh_once_prunes_params_outside_window():
+    warmer = make_warmer()
+    warmer.tracker.window_seconds = 0
+    warmer.register("ns", lambda params: ({}, 1))
+    warmer.lookup("ns", {"query": "a"})
+
+    warmer.refresh_once()
+    assert make_key("ns", normalize_params({"query": "a"})) not in warmer._params
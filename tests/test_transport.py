@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import transport
+from transport import apply_transport, decode_columnar, encode_columnar
+
+PROJECTS = [
+    {
+        "name": "a",
+        "language": "Python",
+        "license": "MIT",
+        "topics": ["agent", "llm"],
+        "description": None,
+        "details": {"readme": "# A"},
+    },
+    {
+        "name": "b",
+        "language": "Python",
+        "topics": ["llm"],
+        "deployment": ["Docker", "CI/CD"],
+        "stars": 5,
+    },
+]
+
+
+def test_columnar_round_trip_with_different_keys():
+    table = encode_columnar(PROJECTS)
+    assert decode_columnar(table) == PROJECTS
+    assert table["dictionaries"]["language"] == ["Python"]
+    assert table["columns"]["topics"] == [[0, 1], [1]]
+    assert table["missing"]["stars"] == [0]
+    # 值为 None 与字段缺失区分开
+    assert "description" not in decode_columnar(table)[1]
+    assert decode_columnar(table)[0]["description"] is None
+
+
+def test_columnar_round_trip_empty():
+    assert decode_columnar(encode_columnar([])) == []
+
+
+def test_apply_transport_json_is_default():
+    result = {"query": "q", "projects": PROJECTS}
+    assert apply_transport(result, None) == (result, "json")
+    assert apply_transport(result, "unknown") == (result, "json")
+
+
+def test_apply_transport_columnar():
+    encoded, fmt = apply_transport({"query": "q", "projects": PROJECTS}, "columnar")
+    assert fmt == "columnar"
+    assert "projects" not in encoded
+    assert decode_columnar(encoded["projects_columnar"]) == PROJECTS
+
+
+def test_apply_transport_msgpack_is_json_serializable():
+    pytest.importorskip("msgpack")
+    encoded, fmt = apply_transport({"query": "q", "projects": PROJECTS}, "msgpack")
+    assert fmt == "msgpack"
+    assert encoded["transport"] == "columnar+msgpack+zlib+base64"
+    wire = json.loads(json.dumps(encoded))
+    assert decode_columnar(transport.unpack(wire["projects_columnar"])) == PROJECTS
+
+
+def test_msgpack_falls_back_to_columnar_without_msgpack(monkeypatch):
+    monkeypatch.setattr(transport, "msgpack", None)
+    encoded, fmt = apply_transport({"projects": PROJECTS}, "msgpack")
+    assert fmt == "columnar"
+    assert encoded["transport"] == "columnar"
@@ -2,13 +2,17 @@
 Agent Deploy Search Skill
 搜索 GitHub 上适合 Agent 部署的开源项目，带有相关性评分
 """
+import copy
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime, timezone
 import requests
 
 from ...base import Skill, SkillContext, SkillResult, SkillStatus
 from ...registry import register_skill
+from ...github_project_search.scripts.github_client import GitHubClient
+from ...github_project_search.scripts.prefetch import get_warmer
+from ...github_project_search.scripts.transport import apply_transport
 
 
 class AgentDeploySearcher:
@@ -23,13 +27,16 @@ class AgentDeploySearcher:
         'vector', 'embedding', 'rag', 'retrieval'
     ]
 
+    DEPLOYMENT_HINT_KEYS = ["has_dockerfile", "has_docker_compose", "has_kubernetes", "has_ci_cd"]
+
     def __init__(self, token: str):
         self.token = token
-        self.api_base = "https://api.github.com"
-        self.headers = {
-            "Authorization": f"token {token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        # 部署文件检查逐个仓库串行执行，单次超时保持在 5 秒以内
+        self.client = GitHubClient(
+            token,
+            default_timeout=15,
+            endpoint_timeouts={"contents": (5.0, 5.0)}
+        )
 
     def search_agent_projects(
         self,
@@ -57,7 +64,6 @@ class AgentDeploySearcher:
         if min_stars > 0:
             search_query += f" stars:>={min_stars}"
 
-        url = f"{self.api_base}/search/repositories"
         params = {
             "q": search_query,
             "sort": sort,
@@ -66,7 +72,7 @@ class AgentDeploySearcher:
         }
 
         try:
-            response = requests.get(url, headers=self.headers, params=params, timeout=15)
+            response = self.client.get("search", "/search/repositories", params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -86,13 +92,14 @@ class AgentDeploySearcher:
                 project["deployment_hints"] = deployment_hints
                 project["deployment"] = self._get_deployment_tags(deployment_hints)
 
-                # 部署就绪过滤
+                # 部署就绪过滤：只排除确定没有部署配置的项目，未知的项目保留并计数
                 if deployment_ready:
-                    if not any([
+                    ready_hints = [
                         deployment_hints.get("has_dockerfile"),
                         deployment_hints.get("has_docker_compose"),
                         deployment_hints.get("has_kubernetes")
-                    ]):
+                    ]
+                    if not any(ready_hints) and None not in ready_hints:
                         continue
 
                 projects.append(project)
@@ -103,18 +110,53 @@ class AgentDeploySearcher:
             # 计算统计信息
             agent_relevant = [p for p in projects if p.get("relevance_score", 0) > 50]
             avg_stars = sum(p.get("stars", 0) for p in projects) // max(len(projects), 1)
+            projects = projects[:per_page]
 
             return {
-                "projects": projects[:per_page],
+                "projects": projects,
                 "total_found": data.get("total_count", 0),
                 "agent_relevant_count": len(agent_relevant),
                 "query": query,
-                "avg_stars": avg_stars
+                "avg_stars": avg_stars,
+                "deployment_unknown_count": sum(
+                    1 for p in projects if p["deployment_hints"].get("unknown")
+                ),
+                "from_cache": getattr(response, "from_cache", False)
             }
 
         except requests.exceptions.RequestException as e:
             return {"error": f"API 请求失败: {str(e)}", "projects": []}
 
+    def search(
+        self,
+        query: str,
+        language: Optional[str] = "Python",
+        sort_by: str = "stars",
+        max_results: int = 10,
+        min_stars: int = 0,
+        deployment_ready: bool = False,
+        get_details: bool = False
+    ) -> Dict[str, Any]:
+        """搜索 Agent 项目并按需生成部署指南"""
+        result = self.search_agent_projects(
+            query=query,
+            language=language,
+            sort=sort_by,
+            per_page=max_results,
+            min_stars=min_stars,
+            deployment_ready=deployment_ready
+        )
+
+        if "error" in result and not result.get("projects"):
+            return result
+
+        # 生成部署指南
+        if get_details and result.get("projects"):
+            result["deployment_guide"] = self.generate_deployment_guide(result["projects"])
+
+        result["generated_at"] = datetime.now().isoformat()
+        return result
+
     def _parse_project(self, item: Dict[str, Any]) -> Dict[str, Any]:
         """解析项目信息"""
         return {
@@ -185,36 +227,50 @@ class AgentDeploySearcher:
 
         return min(int(score), 100)
 
-    def _check_deployment_files(self, full_name: str, branch: str) -> Dict[str, bool]:
-        """检查项目是否包含部署相关文件"""
-        hints = {
-            "has_dockerfile": False,
-            "has_docker_compose": False,
-            "has_kubernetes": False,
-            "has_ci_cd": False
-        }
+    def _check_deployment_files(self, full_name: str, branch: str) -> Dict[str, Any]:
+        """
+        检查项目是否包含部署相关文件
+
+        每个提示为 True（存在）、False（不存在）或 None（未知：请求失败或熔断中），
+        未知的提示同时列在 unknown 字段中。
+        """
+        hints: Dict[str, Any] = {key: None for key in self.DEPLOYMENT_HINT_KEYS}
+        hints["unknown"] = list(self.DEPLOYMENT_HINT_KEYS)
+        hints["from_cache"] = False
 
         try:
             # 获取仓库根目录文件列表
-            url = f"{self.api_base}/repos/{full_name}/contents"
-            response = requests.get(url, headers=self.headers, timeout=5)
-
-            if response.status_code == 200:
-                files = response.json()
-                file_names = [f.get("name", "").lower() for f in files if isinstance(f, dict)]
-
-                hints["has_dockerfile"] = any("dockerfile" in name for name in file_names)
-                hints["has_docker_compose"] = any("docker-compose" in name or "compose.y" in name for name in file_names)
-                hints["has_kubernetes"] = any(name in ["k8s", "kubernetes", "helm", "charts"] for name in file_names)
-                hints["has_ci_cd"] = ".github" in file_names or ".gitlab-ci.yml" in file_names
-
-        except:
-            pass
+            response = self.client.get(
+                "contents",
+                f"/repos/{full_name}/contents",
+                params={"ref": branch}
+            )
+        except requests.exceptions.RequestException:
+            return hints
+
+        if response.status_code == 404:
+            # 空仓库：所有部署文件确定不存在
+            file_names = []
+        elif response.status_code == 200:
+            files = response.json()
+            file_names = [f.get("name", "").lower() for f in files if isinstance(f, dict)]
+        else:
+            return hints
+
+        hints["has_dockerfile"] = any("dockerfile" in name for name in file_names)
+        hints["has_docker_compose"] = any("docker-compose" in name or "compose.y" in name for name in file_names)
+        hints["has_kubernetes"] = any(name in ["k8s", "kubernetes", "helm", "charts"] for name in file_names)
+        hints["has_ci_cd"] = ".github" in file_names or ".gitlab-ci.yml" in file_names
+        hints["unknown"] = []
+        hints["from_cache"] = getattr(response, "from_cache", False)
 
         return hints
 
-    def _get_deployment_tags(self, hints: Dict[str, bool]) -> List[str]:
+    def _get_deployment_tags(self, hints: Dict[str, Any]) -> List[str]:
         """获取部署标签"""
+        if len(hints.get("unknown", [])) == len(self.DEPLOYMENT_HINT_KEYS):
+            return ["未知"]
+
         tags = []
         if hints.get("has_dockerfile"):
             tags.append("Docker")
@@ -311,7 +367,8 @@ class AgentDeploySearchSkill(Skill):
             "max_results": {"type": "integer", "description": "返回数量，默认 10", "default": 10},
             "min_stars": {"type": "integer", "description": "最小星标数", "default": 0},
             "deployment_ready": {"type": "boolean", "description": "只返回部署就绪项目", "default": False},
-            "get_details": {"type": "boolean", "description": "是否生成部署指南", "default": False}
+            "get_details": {"type": "boolean", "description": "是否生成部署指南", "default": False},
+            "response_format": {"type": "string", "description": "projects 编码格式: json(默认)/columnar/msgpack", "default": "json"}
         }
 
     @property
@@ -344,36 +401,54 @@ class AgentDeploySearchSkill(Skill):
             min_stars = context.params.get("min_stars", 0)
             deployment_ready = context.params.get("deployment_ready", False)
             get_details = context.params.get("get_details", False)
+            search_params = {
+                "query": query,
+                "language": language,
+                "sort_by": sort_by,
+                "max_results": max_results,
+                "min_stars": min_stars,
+                "deployment_ready": deployment_ready,
+                "get_details": get_details
+            }
 
-            # 获取 GitHub token
-            token = context.params.get("github_token") or os.environ.get(
-                "GITHUB_TOKEN",
-                ""
-            )
-
-            searcher = AgentDeploySearcher(token)
+            # 使用默认 token 的请求参与预热；显式传入 token 的请求不共享缓存
+            warmer = None if context.params.get("github_token") else get_warmer()
+            result = None
+            if warmer is not None:
+                warmer.register(
+                    self.name,
+                    self._load_for_prefetch,
+                    estimate_cost=self._estimate_prefetch_cost,
+                    available=self._prefetch_available
+                )
+                result = warmer.lookup(self.name, search_params)
+                if result is not None:
+                    # 缓存键忽略大小写和空白，返回调用方自己的查询写法
+                    result = copy.deepcopy(result)
+                    result["query"] = query
+
+            cache_hit = result is not None
+            if result is None:
+                # 获取 GitHub token
+                token = context.params.get("github_token") or os.environ.get(
+                    "GITHUB_TOKEN",
+                    ""
+                )
 
-            # 搜索项目
-            result = searcher.search_agent_projects(
-                query=query,
-                language=language,
-                sort=sort_by,
-                per_page=max_results,
-                min_stars=min_stars,
-                deployment_ready=deployment_ready
-            )
+                searcher = AgentDeploySearcher(token)
+                result = searcher.search(**search_params)
 
-            if "error" in result and not result.get("projects"):
-                return SkillResult(
-                    status=SkillStatus.ERROR,
-                    error=result["error"]
-                )
+                if "error" in result and not result.get("projects"):
+                    return SkillResult(
+                        status=SkillStatus.ERROR,
+                        error=result["error"]
+                    )
 
-            # 生成部署指南
-            if get_details and result.get("projects"):
-                result["deployment_guide"] = searcher.generate_deployment_guide(result["projects"])
+                if warmer is not None:
+                    warmer.store(self.name, search_params, copy.deepcopy(result))
 
-            result["generated_at"] = datetime.now().isoformat()
+            # 按客户端协商的格式编码 projects
+            result, transport = apply_transport(result, context.params.get("response_format"))
 
             execution_time = (datetime.now() - start_time).total_seconds() * 1000
 
@@ -385,7 +460,9 @@ class AgentDeploySearchSkill(Skill):
                 metadata={
                     "query": query,
                     "language": language,
-                    "deployment_ready": deployment_ready
+                    "deployment_ready": deployment_ready,
+                    "cache_hit": cache_hit,
+                    "transport": transport
                 }
             )
 
@@ -396,3 +473,21 @@ class AgentDeploySearchSkill(Skill):
                 error=str(e),
                 execution_time_ms=execution_time
             )
+
+    @staticmethod
+    def _load_for_prefetch(params: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], int]:
+        """预热器回调：使用默认 token 重新执行搜索，返回 (结果, 实际 API 请求数)，失败时结果为 None"""
+        searcher = AgentDeploySearcher(os.environ.get("GITHUB_TOKEN", ""))
+        result = searcher.search(**params)
+        return (None if "error" in result else result), searcher.client.requests_sent
+
+    @staticmethod
+    def _estimate_prefetch_cost(params: Dict[str, Any]) -> int:
+        """预估一次预热消耗的 GitHub API 请求数"""
+        # 1 次搜索，搜索结果数为 max_results 的 2 倍，每个结果各检查一次部署文件
+        return 1 + 2 * int(params.get("max_results") or 10)
+
+    @staticmethod
+    def _prefetch_available() -> bool:
+        """GitHub 熔断期间跳过预热"""
+        return GitHubClient(os.environ.get("GITHUB_TOKEN", "")).is_available()